@@ -6,6 +6,7 @@ import logging
 import os
 import sys
 import configparser
+import json
 from dbus.mainloop.glib import DBusGMainLoop
 from gi.repository import GLib
 sys.path.insert(1, "/opt/victronenergy/dbus-systemcalc-py/ext/velib_python")
@@ -13,7 +14,8 @@ from ve_utils import wrap_dbus_value
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
-logging.info("Starting Generator Derating Monitor with file logging.")
+log = logging.getLogger(__name__)
+log.info("Starting Generator Derating Monitor with file logging.")
 
 # D-Bus service names and paths
 VEBUS_SERVICE_BASE = "com.victronenergy.vebus"
@@ -24,6 +26,14 @@ GPS_SERVICE_BASE = "com.victronenergy.gps"
 DIGITAL_INPUT_SERVICE_BASE = "com.victronenergy.digitalinput"
 SYSTEM_SERVICE = "com.victronenergy.system"
 
+# Service prefixes searched during discovery
+DISCOVERY_SERVICE_BASES = (
+    VEBUS_SERVICE_BASE,
+    TEMPERATURE_SERVICE_BASE,
+    GPS_SERVICE_BASE,
+    DIGITAL_INPUT_SERVICE_BASE,
+)
+
 ALTITUDE_PATH = "/Altitude"
 AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH = "/Ac/ActiveIn/CurrentLimit"
 TEMPERATURE_PATH = "/Temperature"
@@ -33,9 +43,48 @@ PRODUCT_NAME_PATH = "/ProductName"
 BUS_ITEM_INTERFACE = "com.victronenergy.BusItem"
 GENERATOR_CURRENT_LIMIT_PATH = "/Settings/TransferSwitch/GeneratorCurrentLimit"
 
+# Discovery table: (service prefix, finder method, service name attribute, description)
+SERVICE_DISCOVERY = (
+    (VEBUS_SERVICE_BASE, '_find_vebus_service', 'vebus_service', 'VE.Bus service'),
+    (TEMPERATURE_SERVICE_BASE, '_find_outdoor_temperature_service', 'outdoor_temp_service_name', 'outdoor temperature service'),
+    (TEMPERATURE_SERVICE_BASE, '_find_generator_temperature_service', 'generator_temp_service_name', 'generator temperature service'),
+    (GPS_SERVICE_BASE, '_find_gps_service_internal', 'gps_service_name', 'GPS service'),
+    (DIGITAL_INPUT_SERVICE_BASE, '_find_transfer_switch_input_internal', 'transfer_switch_service', 'transfer switch input service'),
+    (DIGITAL_INPUT_SERVICE_BASE, '_find_gen_auto_current_input_internal', 'gen_auto_current_service', "'Gen Auto Current' input service"),
+)
+
+# Per-service name checks of the roles that are picked by name; the other roles take any service under their prefix
+SERVICE_MATCHERS = {
+    'outdoor_temp_service_name': '_is_outdoor_temperature_service',
+    'generator_temp_service_name': '_is_generator_temperature_service',
+    'transfer_switch_service': '_is_transfer_switch_input',
+    'gen_auto_current_service': '_is_gen_auto_current_input',
+}
+
+# Paths whose PropertiesChanged signals are followed, per discovered service attribute
+WATCHED_PATHS = {
+    'vebus_service': (AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH,),
+    'outdoor_temp_service_name': (TEMPERATURE_PATH,),
+    'generator_temp_service_name': (TEMPERATURE_PATH,),
+    'gps_service_name': (ALTITUDE_PATH,),
+    'transfer_switch_service': (STATE_PATH,),
+    'gen_auto_current_service': (STATE_PATH,),
+}
+
+# Unit conversions for sensor readings
+ALT_M_TO_FT = 3.28084
+C_TO_F_SCALE = 9 / 5
+C_TO_F_OFFSET = 32.0
+
 # Transfer switch state values
-GENERATOR_ON_VALUE = (12, 3)
-SHORE_POWER_ON_VALUE = (13, 2)
+GENERATOR_ON_VALUE = frozenset((12, 3))
+SHORE_POWER_ON_VALUE = frozenset((13, 2))
+
+# Safety-net interval: re-reads the watched paths in case a signal was missed, and retries discovery and failed writes
+WATCHDOG_INTERVAL_SECONDS = 60
+
+# Outdoor temperature (F) or altitude (feet) must move by more than this before its linear multiplier is recomputed
+MULTIPLIER_INPUT_TOLERANCE = 0.5
 
 # Gen Auto Current State Values
 GEN_AUTO_CURRENT_OFF = 2
@@ -43,13 +92,84 @@ GEN_AUTO_CURRENT_ON = 3
 
 # CORRECTED: Configuration file path
 CONFIG_FILE_PATH = '/data/setupOptions/GenAutoCurrent/optionsSet'
+# Last discovered service names, reused as hints after a restart (/data survives reboots and updates)
+SERVICE_CACHE_FILE_PATH = '/data/setupOptions/GenAutoCurrent/services.json'
+
+def _q(x):
+    """Quantizes a current limit to integer tenths of an amp so limits compare exactly."""
+    return int(x * 10 + (0.5 if x >= 0 else -0.5))
+
+def _celsius_to_fahrenheit(temp_celsius):
+    return temp_celsius * C_TO_F_SCALE + C_TO_F_OFFSET
+
+def _unpack_altitude(altitude_raw):
+    """Returns the altitude in meters; an empty dbus.Array means no valid value."""
+    # Checked per value: Venus sends an empty array until the GPS has a fix, then plain scalars (0.0 at sea level)
+    if isinstance(altitude_raw, dbus.Array):
+        return float(altitude_raw[0]) if len(altitude_raw) else None
+    return float(altitude_raw)
+
+# Lower-case keywords matched against CustomName/ProductName during service discovery
+OUTDOOR_KEYWORDS = ("outdoor",)
+GEN_KEYWORDS = ("gen", "generator")
+TRANSFER_KEYWORDS = ("transfer switch",)
+GEN_AUTO_KEYWORDS = ("gen auto current",)
+
+def _name_matches(name, keywords):
+    name_lower = (name or "").lower()
+    return any(keyword in name_lower for keyword in keywords)
+
+def _is_outdoor_temperature_name(name):
+    return _name_matches(name, OUTDOOR_KEYWORDS)
+
+def _is_generator_temperature_name(name):
+    return _name_matches(name, GEN_KEYWORDS)
+
+def _is_transfer_switch_name(name):
+    return _name_matches(name, TRANSFER_KEYWORDS)
+
+def _is_gen_auto_current_name(name):
+    return _name_matches(name, GEN_AUTO_KEYWORDS)
 
 class GeneratorDeratingMonitor:
+    # Fixed attribute set: no per-instance __dict__, and slot access in the tick
+    __slots__ = (
+        # D-Bus connection and caches
+        'bus', '_proxy_cache', '_signal_matches', '_last_written',
+        # Config values, see _load_and_set_config
+        'BASE_TEMPERATURE_THRESHOLD_F', 'TEMP_COEFFICIENT', 'ALTITUDE_COEFFICIENT',
+        'BASE_GENERATOR_OUTPUT_AMPS', 'OUTPUT_BUFFER',
+        'HIGH_GENTEMP_THRESHOLD_F', 'MEDIUM_GENTEMP_THRESHOLD_F',
+        'HIGH_GENTEMP_REDUCTION', 'MEDIUM_GENTEMP_REDUCTION',
+        'DEFAULT_ALTITUDE_FEET', 'DEFAULT_GENERATOR_TEMP_F', 'DEFAULT_OUTDOOR_TEMP_F',
+        '_buffered_output_amps',
+        # Discovered services
+        'vebus_service', 'outdoor_temp_service_name', 'generator_temp_service_name',
+        'gps_service_name', 'transfer_switch_service', 'settings_service_name',
+        'gen_auto_current_service',
+        # Signal-fed values and state
+        'gen_auto_current_state', 'transfer_switch_state', 'generator_current_limit_setting',
+        'ac_current_limit', 'previous_gen_auto_current_state', 'initial_derated_output_logged',
+        'initial_altitude', 'initial_outdoor_temp', 'initial_generator_temp',
+        '_previous_ac_current_limit_q', '_previous_generator_current_limit_setting_q',
+        'outdoor_temp_fahrenheit', 'altitude_feet', 'generator_temp_fahrenheit',
+        'altitude_warning_logged', 'altitude_value_logged_after_warning',
+        '_cached_service_names', '_pending_discovery', '_discovery_complete', '_tick_pending', '_owned_by_base',
+        # Derating multiplier cache
+        '_outdoor_mult_input', '_outdoor_mult', '_altitude_mult_input', '_altitude_mult',
+        '_last_derate_inputs',
+    )
+
     def __init__(self):
         self.bus = dbus.SystemBus()
+        self._proxy_cache = {} # (service_name, path) -> bound BusItem methods by name
+        self._signal_matches = {} # (service_name, path) -> PropertiesChanged signal match
+        self._last_written = {} # (service_name, path) -> last value written by this service
 
         # Load settings from the config file
         self._load_and_set_config()
+        # Buffered rated output; the constant part of every derating result
+        self._buffered_output_amps = self.BASE_GENERATOR_OUTPUT_AMPS * self.OUTPUT_BUFFER
 
         self.vebus_service = None
         self.outdoor_temp_service_name = None
@@ -59,22 +179,34 @@ class GeneratorDeratingMonitor:
         self.settings_service_name = SETTINGS_SERVICE_NAME
         self.gen_auto_current_service = None
         self.gen_auto_current_state = None
+        self.transfer_switch_state = None
+        self.generator_current_limit_setting = None
+        self.ac_current_limit = None
         self.previous_gen_auto_current_state = None
         self.initial_derated_output_logged = False
         self.initial_altitude = None
         self.initial_outdoor_temp = None
         self.initial_generator_temp = None
-        self.previous_ac_current_limit = None
-        self.previous_generator_current_limit_setting = None
+        self._previous_ac_current_limit_q = None # tenths of an amp, see _q
+        self._previous_generator_current_limit_setting_q = None
         self.outdoor_temp_fahrenheit = self.DEFAULT_OUTDOOR_TEMP_F
         self.altitude_feet = self.DEFAULT_ALTITUDE_FEET
         self.generator_temp_fahrenheit = self.DEFAULT_GENERATOR_TEMP_F
-        self.service_discovery_retries = 1
-        self.service_discovery_delay = 5
         self.altitude_warning_logged = False
         self.altitude_value_logged_after_warning = False
-
-        GLib.timeout_add_seconds(5, self._delayed_initialization)
+        self._cached_service_names = self._load_service_cache() # service name attribute -> name found before the last restart
+        self._pending_discovery = set() # service prefixes queued for a one-shot discovery
+        self._discovery_complete = False # every role in SERVICE_DISCOVERY has a service
+        self._tick_pending = False
+        self._owned_by_base = None # discovery prefix -> owned bus names, kept current by NameOwnerChanged
+        # Cached linear derating multipliers and the inputs they were computed from
+        self._outdoor_mult_input = None
+        self._outdoor_mult = 1.0
+        self._altitude_mult_input = None
+        self._altitude_mult = 1.0
+        self._last_derate_inputs = None # inputs of the last completed derating pass
+
+        GLib.timeout_add_seconds(5, self._delayed_initialization, priority=GLib.PRIORITY_DEFAULT_IDLE)
         
     def _load_and_set_config(self):
         """Loads settings from config file, with hardcoded defaults as fallback."""
@@ -95,12 +227,12 @@ class GeneratorDeratingMonitor:
         self.DEFAULT_OUTDOOR_TEMP_F = 77.0
 
         if not os.path.exists(CONFIG_FILE_PATH):
-            logging.warning(f"Config file not found at {CONFIG_FILE_PATH}. Using default settings.")
+            log.warning(f"Config file not found at {CONFIG_FILE_PATH}. Using default settings.")
             return
 
         try:
             config.read(CONFIG_FILE_PATH)
-            logging.info(f"Successfully loaded settings from {CONFIG_FILE_PATH}")
+            log.info(f"Successfully loaded settings from {CONFIG_FILE_PATH}")
             
             # Read DeratingConstants
             self.BASE_TEMPERATURE_THRESHOLD_F = config.getfloat('DeratingConstants', 'BaseTemperatureThresholdF', fallback=self.BASE_TEMPERATURE_THRESHOLD_F)
@@ -119,391 +251,596 @@ class GeneratorDeratingMonitor:
             self.DEFAULT_OUTDOOR_TEMP_F = config.getfloat('DefaultSensorValues', 'DefaultOutdoorTempF', fallback=self.DEFAULT_OUTDOOR_TEMP_F)
 
         except (configparser.Error, ValueError) as e:
-            logging.error(f"Error reading config file {CONFIG_FILE_PATH}: {e}. Using default settings.")
+            log.error(f"Error reading config file {CONFIG_FILE_PATH}: {e}. Using default settings.")
 
-    def _find_service_once(self, find_function, service_name_attribute, service_description):
-        """Attempts to find a service once and logs the result."""
-        find_function()
-        if getattr(self, service_name_attribute):
-            logging.info(f"Found {service_description}: {getattr(self, service_name_attribute)}")
-            return True
-        else:
-            logging.warning(f"Could not find {service_description}. Will retry in periodic monitoring.")
-            return False
+    def _load_service_cache(self):
+        """Loads the service names saved by a previous run; an unreadable file just means a full discovery."""
+        try:
+            with open(SERVICE_CACHE_FILE_PATH) as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring service cache {SERVICE_CACHE_FILE_PATH}: {e}")
+            return {}
+        if not isinstance(cached, dict):
+            return {}
+        return {attr: name for attr, name in cached.items() if isinstance(name, str)}
+
+    def _save_service_cache(self):
+        """Writes the currently discovered service names when they differ from the saved ones."""
+        # Roles not found this time keep their saved name, so a sensor that is late on the bus is still a hint next boot
+        names = dict(self._cached_service_names)
+        names.update((attr, getattr(self, attr)) for _, _, attr, _ in SERVICE_DISCOVERY if getattr(self, attr))
+        if names == self._cached_service_names:
+            return
+        tmp_path = SERVICE_CACHE_FILE_PATH + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(names, f)
+            os.replace(tmp_path, SERVICE_CACHE_FILE_PATH) # never leave a half-written cache behind
+        except OSError as e:
+            log.warning(f"Could not save service cache {SERVICE_CACHE_FILE_PATH}: {e}")
+            return
+        self._cached_service_names = names
 
     def _delayed_initialization(self):
+        # React to services appearing and disappearing instead of re-scanning every tick.
+        # Subscribed before the first listing so the name index cannot miss a change.
+        self.bus.add_signal_receiver(self._on_name_owner_changed, signal_name='NameOwnerChanged', dbus_interface='org.freedesktop.DBus')
+
         # Initial attempts to find services (without extensive retries here)
-        self._find_service_once(self._find_vebus_service, 'vebus_service', 'VE.Bus service')
-        self._find_service_once(self._find_outdoor_temperature_service, 'outdoor_temp_service_name', 'outdoor temperature service')
-        self._find_service_once(self._find_generator_temperature_service, 'generator_temp_service_name', 'generator temperature service')
-        self._find_service_once(self._find_gps_service_internal, 'gps_service_name', 'GPS service')
-        self._find_service_once(self._find_transfer_switch_input_internal, 'transfer_switch_service', 'transfer switch input service')
-        self._find_service_once(self._find_gen_auto_current_input_internal, 'gen_auto_current_service', "'Gen Auto Current' input service")
+        self._discover_missing_services()
 
+        self._watch_path(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)
         self._read_initial_values()
-        GLib.timeout_add(5000, self._periodic_monitoring)
+        # Low priority so pending D-Bus signals (e.g. a transfer switch change) are handled first
+        GLib.timeout_add_seconds(WATCHDOG_INTERVAL_SECONDS, self._periodic_monitoring, priority=GLib.PRIORITY_LOW)
         return GLib.SOURCE_REMOVE
 
+    def _on_name_owner_changed(self, name, old_owner, new_owner):
+        if name.startswith(':'):
+            return
+        if self._owned_by_base is not None:
+            for service_base, owned in self._owned_by_base.items():
+                if name.startswith(service_base):
+                    if new_owner:
+                        owned.add(name)
+                    else:
+                        owned.discard(name)
+        if new_owner and self._discovery_complete:
+            return # nothing is missing, so a new service cannot fill a role
+        for service_base, _, service_name_attribute, service_description in SERVICE_DISCOVERY:
+            if not name.startswith(service_base):
+                continue
+            if not new_owner and getattr(self, service_name_attribute) == name:
+                log.warning(f"Lost {service_description}: {name}")
+                self._invalidate_proxies(name)
+                setattr(self, service_name_attribute, None)
+                self._discovery_complete = False
+                self._schedule_discovery(service_base)
+            elif new_owner and not getattr(self, service_name_attribute):
+                self._schedule_discovery(service_base)
+
+    def _schedule_discovery(self, service_base):
+        """Queues a one-shot discovery of the missing services under service_base."""
+        if service_base not in self._pending_discovery:
+            self._pending_discovery.add(service_base)
+            GLib.idle_add(self._discover_services, service_base)
+
+    def _discover_services(self, service_base):
+        self._pending_discovery.discard(service_base)
+        self._discover_missing_services(service_base)
+        return GLib.SOURCE_REMOVE
+
+    def _discover_missing_services(self, service_base=None):
+        """Runs the finder of every missing service (optionally only under service_base), logging each result."""
+        if self._discovery_complete:
+            return
+        buckets = self._bucket_service_names()
+        for base, find_method, service_name_attribute, service_description in SERVICE_DISCOVERY:
+            if (service_base and base != service_base) or getattr(self, service_name_attribute):
+                continue
+            cached_name = self._cached_service_names.get(service_name_attribute)
+            if cached_name in buckets.get(base, ()) and self._matches_role(service_name_attribute, cached_name):
+                # The saved winner still passes this role's check; skip the scan
+                setattr(self, service_name_attribute, cached_name)
+            else:
+                getattr(self, find_method)(buckets)
+            service_name = getattr(self, service_name_attribute)
+            if service_name:
+                log.info(f"Found {service_description}: {service_name}")
+                self._watch_service(service_name_attribute)
+            else:
+                log.warning(f"Could not find {service_description}. Will retry in periodic monitoring and when a matching service appears.")
+        self._discovery_complete = all(getattr(self, attr) for _, _, attr, _ in SERVICE_DISCOVERY)
+        self._save_service_cache()
+
     def _read_initial_values(self):
-        self._update_outdoor_temperature(log_update=False, log_initial=True)
-        self._update_altitude(log_update=False, log_initial=True)
-        self._update_generator_temperature(log_update=False, log_initial=True)
-        self._update_gen_auto_current_state(initial_read=True)
+        # Sensor and input states were seeded when their services were watched
         # Initial read of the generator current limit setting
-        current_limit = self._get_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)
+        current_limit = self.generator_current_limit_setting
         if current_limit is not None:
-            self.previous_generator_current_limit_setting = round(float(current_limit), 1)
-            logging.info(f"Initial Generator Current Limit setting: {self.previous_generator_current_limit_setting:.1f} Amps")
+            self._previous_generator_current_limit_setting_q = _q(current_limit)
+            log.info(f"Initial Generator Current Limit setting: {self._previous_generator_current_limit_setting_q / 10:.1f} Amps")
 
         # Initial read of the AC active input current limit
-        ac_limit = self._get_dbus_value(self.vebus_service, AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH)
+        ac_limit = self.ac_current_limit
         if ac_limit is not None:
-            self.previous_ac_current_limit = round(float(ac_limit), 1)
-            logging.info(f"Initial VE.Bus AC Active Input Current Limit: {self.previous_ac_current_limit:.1f} Amps")
-
-    def _find_service(self, service_base):
-        services = [name for name in self.bus.list_names() if name.startswith(service_base)]
+            self._previous_ac_current_limit_q = _q(ac_limit)
+            log.info(f"Initial VE.Bus AC Active Input Current Limit: {self._previous_ac_current_limit_q / 10:.1f} Amps")
+
+    def _bucket_service_names(self):
+        """Groups the bus names by discovery prefix, listing the bus only the first time."""
+        if self._owned_by_base is None:
+            names = self.bus.list_names()
+            self._owned_by_base = {base: {name for name in names if name.startswith(base)} for base in DISCOVERY_SERVICE_BASES}
+        return {base: sorted(owned) for base, owned in self._owned_by_base.items()}
+
+    def _service_candidates(self, service_base, buckets=None):
+        if buckets is None:
+            buckets = self._bucket_service_names()
+        return buckets.get(service_base, [])
+
+    def _find_service(self, service_base, buckets=None):
+        services = self._service_candidates(service_base, buckets)
         return services[0] if services else None
 
-    def _find_vebus_service(self):
-        self.vebus_service = self._find_service(VEBUS_SERVICE_BASE)
+    def _matches_role(self, service_name_attribute, service_name):
+        matcher = SERVICE_MATCHERS.get(service_name_attribute)
+        return matcher is None or getattr(self, matcher)(service_name)
 
-    def _get_dbus_value(self, service_name, path):
+    def _find_vebus_service(self, buckets=None):
+        self.vebus_service = self._find_service(VEBUS_SERVICE_BASE, buckets)
+
+    def _bus_item_method(self, service_name, path, method_name):
+        """Returns a cached bound BusItem method (GetValue/SetValue) for service_name/path, resolving the object on first use."""
+        key = (service_name, path)
+        methods = self._proxy_cache.get(key)
+        if methods is None:
+            # Bind once: attribute access on a dbus.Interface builds a new method wrapper every time
+            obj = self.bus.get_object(service_name, path)
+            methods = {name: obj.get_dbus_method(name, BUS_ITEM_INTERFACE) for name in ('GetValue', 'SetValue')}
+            self._proxy_cache[key] = methods
+        return methods[method_name]
+
+    def _invalidate_proxies(self, service_name):
+        """Drops every cached interface and signal match belonging to service_name so the next call re-resolves it."""
+        if not service_name:
+            return
+        for key in [key for key in self._proxy_cache if key[0] == service_name]:
+            del self._proxy_cache[key]
+        for key in [key for key in self._signal_matches if key[0] == service_name]:
+            self._signal_matches.pop(key).remove()
+        for key in [key for key in self._last_written if key[0] == service_name]:
+            del self._last_written[key]
+
+    def _note_observed_value(self, service_name, path, value):
+        """Forgets the last written value of a path once it is seen holding something else, e.g. after a manual change."""
+        key = (service_name, path)
+        if key in self._last_written and self._last_written[key] != value:
+            del self._last_written[key]
+
+    def _watch_service(self, service_name_attribute):
+        """Subscribes to the paths of a freshly discovered service."""
+        service_name = getattr(self, service_name_attribute)
+        for path in WATCHED_PATHS.get(service_name_attribute, ()):
+            self._watch_path(service_name, path)
+
+    def _watch_path(self, service_name, path):
+        """Follows PropertiesChanged for service_name/path and seeds the cached value with one read."""
+        key = (service_name, path)
+        if not service_name or key in self._signal_matches:
+            return
+        try:
+            self._signal_matches[key] = self.bus.add_signal_receiver(
+                lambda changes: self._on_props_changed(service_name, path, changes),
+                signal_name='PropertiesChanged',
+                dbus_interface=BUS_ITEM_INTERFACE,
+                bus_name=service_name,
+                path=path)
+        except dbus.exceptions.DBusException as e:
+            log.error(f"D-Bus error subscribing to {service_name}{path}: {e}")
+            return
+        value = self._get_dbus_value(service_name, path)
+        if value is not None:
+            self._on_props_changed(service_name, path, {'Value': value})
+
+    def _on_props_changed(self, service_name, path, changes):
+        if 'Value' not in changes:
+            return
+        value = changes['Value']
+        self._note_observed_value(service_name, path, value)
+        if path == TEMPERATURE_PATH:
+            if service_name == self.outdoor_temp_service_name:
+                self._update_outdoor_temperature(value, log_initial=True)
+            if service_name == self.generator_temp_service_name:
+                self._update_generator_temperature(value, log_initial=True)
+        elif path == ALTITUDE_PATH and service_name == self.gps_service_name:
+            self._update_altitude(value, log_initial=True)
+        elif path == STATE_PATH:
+            if service_name == self.transfer_switch_service:
+                # Cast once so membership tests hash a plain int; an empty array means invalid
+                self.transfer_switch_state = None if isinstance(value, dbus.Array) else int(value)
+            if service_name == self.gen_auto_current_service:
+                self._update_gen_auto_current_state(value, initial_read=self.gen_auto_current_state is None)
+        elif path == GENERATOR_CURRENT_LIMIT_PATH and service_name == self.settings_service_name:
+            self.generator_current_limit_setting = value
+        elif path == AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH and service_name == self.vebus_service:
+            self.ac_current_limit = value
+        self._schedule_tick()
+
+    def _schedule_tick(self):
+        """Runs _tick once the mainloop is idle, coalescing every signal that arrives before then."""
+        if not self._tick_pending:
+            self._tick_pending = True
+            GLib.idle_add(self._run_scheduled_tick)
+
+    def _run_scheduled_tick(self):
+        self._tick_pending = False
+        self._tick()
+        return GLib.SOURCE_REMOVE
+
+    def _get_dbus_value(self, service_name, path, log_level=logging.ERROR):
         if not service_name: # Added check
             return None
         try:
-            obj = self.bus.get_object(service_name, path)
-            interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-            return interface.GetValue()
+            value = self._bus_item_method(service_name, path, 'GetValue')()
+            self._note_observed_value(service_name, path, value)
+            return value
         except dbus.exceptions.DBusException as e: # More specific exception
-            logging.error(f"D-Bus error getting value from {service_name}{path}: {e}")
+            self._proxy_cache.pop((service_name, path), None)
+            log.log(log_level, "D-Bus error getting value from %s%s: %s", service_name, path, e)
+            return None
+
+    def _get_dbus_root(self, service_name):
+        """Fetches every item of service_name with one GetValue on "/". Returns None if unsupported."""
+        # localsettings exports a very large tree; never fetch it whole
+        if not service_name or service_name == SETTINGS_SERVICE_NAME:
             return None
-        except Exception as e: # Catch other unexpected errors
-            logging.error(f"Unexpected error getting value from {service_name}{path}: {e}")
+        try:
+            return self._bus_item_method(service_name, "/", 'GetValue')()
+        except dbus.exceptions.DBusException as e:
+            self._proxy_cache.pop((service_name, "/"), None)
+            log.debug("D-Bus error getting root value from %s: %s", service_name, e)
             return None
 
+    def _get_dbus_items(self, service_name, paths):
+        """Returns {path: value} for paths on service_name, in one round-trip where the service supports it."""
+        # A single path is cheaper to read directly than to pull the whole tree for
+        root = self._get_dbus_root(service_name) if len(paths) > 1 else None
+        if isinstance(root, dict):
+            # Root keys are the item paths without their leading slash
+            return {path: root.get(path.lstrip("/")) for path in paths}
+        return {path: self._get_dbus_value(service_name, path, logging.DEBUG) for path in paths}
+
     def _set_dbus_value(self, service_name, path, value):
         if not service_name: # Added check
-            logging.warning(f"Attempted to set D-Bus value for {path} but service_name is None.")
+            log.warning(f"Attempted to set D-Bus value for {path} but service_name is None.")
+            return
+        key = (service_name, path)
+        if key in self._last_written and self._last_written[key] == value:
             return
+        # Asynchronous so a slow service (e.g. vebus) does not stall the mainloop; the
+        # value is recorded up front and forgotten again if the write fails
+        self._last_written[key] = value
         try:
-            obj = self.bus.get_object(service_name, path)
-            interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-            interface.SetValue(wrap_dbus_value(value))
+            self._bus_item_method(service_name, path, 'SetValue')(
+                wrap_dbus_value(value),
+                reply_handler=lambda result: self._on_set_reply(service_name, path, value, result),
+                error_handler=lambda e: self._on_set_error(service_name, path, value, e))
         except dbus.exceptions.DBusException as e: # More specific exception
-            logging.error(f"D-Bus error setting value for {service_name}{path} to {value}: {e}")
-        except Exception as e: # Catch other unexpected errors
-            logging.error(f"Unexpected error setting value for {service_name}{path} to {value}: {e}")
+            self._on_set_error(service_name, path, value, e)
+
+    def _on_set_reply(self, service_name, path, value, result):
+        # BusItem SetValue returns 0 on success; anything else means the service rejected the value
+        if result:
+            self._last_written.pop((service_name, path), None)
+            self._last_derate_inputs = None
+            log.warning(f"{service_name}{path} rejected value {value} (result {result})")
+
+    def _on_set_error(self, service_name, path, value, e):
+        self._proxy_cache.pop((service_name, path), None)
+        self._last_written.pop((service_name, path), None)
+        self._last_derate_inputs = None # let the next pass retry
+        log.error(f"D-Bus error setting value for {service_name}{path} to {value}: {e}")
+
+    def _is_outdoor_temperature_service(self, service_name):
+        custom_name = self._get_dbus_value(service_name, CUSTOM_NAME_PATH, logging.DEBUG)
+        log.debug("Checking service: %s, CustomName: '%s' for outdoor temperature.", service_name, custom_name)
+        return _is_outdoor_temperature_name(custom_name)
+
+    def _is_generator_temperature_service(self, service_name):
+        # CustomName and ProductName come back together from a single root GetValue
+        items = self._get_dbus_items(service_name, (CUSTOM_NAME_PATH, PRODUCT_NAME_PATH))
+        custom_name = items[CUSTOM_NAME_PATH]
+        log.debug("Checking service: %s, CustomName: '%s' for generator temperature.", service_name, custom_name)
+        if _is_generator_temperature_name(custom_name):
+            return True
+        product_name = items[PRODUCT_NAME_PATH]
+        log.debug("Checking service: %s, ProductName: '%s' for generator temperature.", service_name, product_name)
+        return _is_generator_temperature_name(product_name)
+
+    def _is_transfer_switch_input(self, service_name):
+        product_name = self._get_dbus_value(service_name, PRODUCT_NAME_PATH, logging.DEBUG)
+        log.debug("Checking service: %s, ProductName: '%s' for transfer switch.", service_name, product_name)
+        return _is_transfer_switch_name(product_name)
 
-    def _find_outdoor_temperature_service(self):
+    def _is_gen_auto_current_input(self, service_name):
+        product_name = self._get_dbus_value(service_name, PRODUCT_NAME_PATH, logging.DEBUG)
+        log.debug("Checking service: %s, ProductName: '%s' for Gen Auto Current.", service_name, product_name)
+        return _is_gen_auto_current_name(product_name)
+
+    def _find_outdoor_temperature_service(self, buckets=None):
         self.outdoor_temp_service_name = None # Reset before search
-        temperature_services = [name for name in self.bus.list_names() if name.startswith(TEMPERATURE_SERVICE_BASE)]
+        temperature_services = self._service_candidates(TEMPERATURE_SERVICE_BASE, buckets)
         for service_name in temperature_services:
-            try:
-                obj = self.bus.get_object(service_name, CUSTOM_NAME_PATH)
-                interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-                custom_name = interface.GetValue()
-                logging.debug(f"Checking service: {service_name}, CustomName: '{custom_name}' for outdoor temperature.")
-                if custom_name and "Outdoor" in custom_name:
-                    self.outdoor_temp_service_name = service_name
-                    return
-            except dbus.exceptions.DBusException as e:
-                logging.debug(f"D-Bus error checking CustomName for {service_name}: {e}")
-            except Exception as e:
-                logging.debug(f"Unexpected error checking CustomName for {service_name}: {e}")
-
-    def _find_generator_temperature_service(self):
+            if self._is_outdoor_temperature_service(service_name):
+                self.outdoor_temp_service_name = service_name
+                return
+
+    def _find_generator_temperature_service(self, buckets=None):
         self.generator_temp_service_name = None # Reset before search
-        temperature_services = [name for name in self.bus.list_names() if name.startswith(TEMPERATURE_SERVICE_BASE)]
+        temperature_services = self._service_candidates(TEMPERATURE_SERVICE_BASE, buckets)
         for service_name in temperature_services:
-            try:
-                obj = self.bus.get_object(service_name, CUSTOM_NAME_PATH)
-                interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-                custom_name = interface.GetValue()
-                logging.debug(f"Checking service: {service_name}, CustomName: '{custom_name}' for generator temperature.")
-                if custom_name and any(keyword in custom_name for keyword in ["gen", "Gen", "generator", "Generator"]):
-                    self.generator_temp_service_name = service_name
-                    return
-            except dbus.exceptions.DBusException as e:
-                logging.debug(f"D-Bus error checking CustomName for {service_name}: {e}")
-            except Exception as e:
-                logging.debug(f"Unexpected error checking CustomName for {service_name}: {e}")
-
-            try:
-                obj = self.bus.get_object(service_name, PRODUCT_NAME_PATH)
-                interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-                product_name = interface.GetValue()
-                logging.debug(f"Checking service: {service_name}, ProductName: '{product_name}' for generator temperature.")
-                if product_name and any(keyword in product_name for keyword in ["gen", "Gen", "generator", "Generator"]):
-                    self.generator_temp_service_name = service_name
-                    return
-            except dbus.exceptions.DBusException as e:
-                logging.debug(f"D-Bus error checking ProductName for {service_name}: {e}")
-            except Exception as e:
-                logging.debug(f"Unexpected error checking ProductName for {service_name}: {e}")
-
-    def _find_gps_service_internal(self): # Renamed to internal
-        self.gps_service_name = self._find_service(GPS_SERVICE_BASE)
-
-    def _find_transfer_switch_input_internal(self): # Renamed to internal
+            if self._is_generator_temperature_service(service_name):
+                self.generator_temp_service_name = service_name
+                return
+
+    def _find_gps_service_internal(self, buckets=None): # Renamed to internal
+        self.gps_service_name = self._find_service(GPS_SERVICE_BASE, buckets)
+
+    def _find_transfer_switch_input_internal(self, buckets=None): # Renamed to internal
         self.transfer_switch_service = None # Reset before search
-        service_names = [name for name in self.bus.list_names() if name.startswith(DIGITAL_INPUT_SERVICE_BASE)]
+        service_names = self._service_candidates(DIGITAL_INPUT_SERVICE_BASE, buckets)
         for service_name in service_names:
-            try:
-                obj = self.bus.get_object(service_name, PRODUCT_NAME_PATH)
-                interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-                product_name = interface.GetValue()
-                logging.debug(f"Checking service: {service_name}, ProductName: '{product_name}' for transfer switch.")
-                if product_name and ("Transfer Switch" in product_name or "transfer switch" in product_name):
-                    self.transfer_switch_service = service_name
-                    return
-            except dbus.exceptions.DBusException as e:
-                logging.debug(f"D-Bus error checking product name for {service_name}: {e}")
-            except Exception as e:
-                logging.debug(f"Unexpected error checking product name for {service_name}: {e}")
-
-    def _find_gen_auto_current_input_internal(self): # Renamed to internal
+            if self._is_transfer_switch_input(service_name):
+                self.transfer_switch_service = service_name
+                return
+
+    def _find_gen_auto_current_input_internal(self, buckets=None): # Renamed to internal
         self.gen_auto_current_service = None # Reset before search
-        service_names = [name for name in self.bus.list_names() if name.startswith(DIGITAL_INPUT_SERVICE_BASE)]
+        service_names = self._service_candidates(DIGITAL_INPUT_SERVICE_BASE, buckets)
         for service_name in service_names:
-            try:
-                obj = self.bus.get_object(service_name, PRODUCT_NAME_PATH)
-                interface = dbus.Interface(obj, BUS_ITEM_INTERFACE)
-                product_name = interface.GetValue()
-                logging.debug(f"Checking service: {service_name}, ProductName: '{product_name}' for Gen Auto Current.")
-                if product_name and ("Gen Auto Current" in product_name or "gen auto current" in product_name):
-                    self.gen_auto_current_service = service_name
-                    return
-            except dbus.exceptions.DBusException as e:
-                logging.debug(f"D-Bus error checking product name for {service_name}: {e}")
-            except Exception as e:
-                logging.debug(f"Unexpected error checking product name for {service_name}: {e}")
-
-    def _update_outdoor_temperature(self, log_update=True, log_initial=False):
+            if self._is_gen_auto_current_input(service_name):
+                self.gen_auto_current_service = service_name
+                return
+
+    def _update_outdoor_temperature(self, temp_celsius, log_update=True, log_initial=False):
         if self.outdoor_temp_service_name:
-            temp_celsius = self._get_dbus_value(self.outdoor_temp_service_name, TEMPERATURE_PATH)
             if temp_celsius is not None:
-                self.outdoor_temp_fahrenheit = (temp_celsius * 9/5) + 32
+                self.outdoor_temp_fahrenheit = _celsius_to_fahrenheit(temp_celsius)
                 if log_initial and self.initial_outdoor_temp is None:
                     self.initial_outdoor_temp = self.outdoor_temp_fahrenheit
-                    logging.info(f"Initial Outdoor Temperature: {self.initial_outdoor_temp:.2f} F")
+                    log.info(f"Initial Outdoor Temperature: {self.initial_outdoor_temp:.2f} F")
                 elif log_update:
-                    logging.debug(f"Updated outdoor temperature: {self.outdoor_temp_fahrenheit:.2f} F")
+                    log.debug("Updated outdoor temperature: %.2f F", self.outdoor_temp_fahrenheit)
             else:
-                logging.debug("Could not retrieve outdoor temperature from D-Bus. Service might be gone or path invalid.")
+                log.debug("Could not retrieve outdoor temperature from D-Bus. Service might be gone or path invalid.")
         else:
-            logging.debug("Outdoor temperature service not found. Using default value.")
+            log.debug("Outdoor temperature service not found. Using default value.")
 
-    def _update_altitude(self, log_update=True, log_initial=False):
+    def _update_altitude(self, altitude_raw, log_update=True, log_initial=False):
         if self.gps_service_name:
-            altitude_raw = self._get_dbus_value(self.gps_service_name, ALTITUDE_PATH)
             altitude_meters = None # Initialize to None
 
             if altitude_raw is not None:
                 try:
-                    if isinstance(altitude_raw, dbus.Array):
-                        if altitude_raw:
-                            altitude_meters = float(altitude_raw[0])
-                        else:
-                            if not self.altitude_warning_logged:
-                                logging.warning("Received empty dbus.Array for altitude. Using previous or default altitude.")
-                                self.altitude_warning_logged = True
-                            self.altitude_value_logged_after_warning = False # Reset flag for next valid value
-                    else:
-                        altitude_meters = float(altitude_raw)
+                    altitude_meters = _unpack_altitude(altitude_raw)
 
-                    if altitude_meters is not None:
-                        self.altitude_feet = altitude_meters * 3.28084
+                    if altitude_meters is None:
+                        if not self.altitude_warning_logged:
+                            log.warning("Received empty dbus.Array for altitude. Using previous or default altitude.")
+                            self.altitude_warning_logged = True
+                        self.altitude_value_logged_after_warning = False # Reset flag for next valid value
+                    else:
+                        self.altitude_feet = altitude_meters * ALT_M_TO_FT
                         if log_initial and self.initial_altitude is None:
                             self.initial_altitude = self.altitude_feet
-                            logging.info(f"Initial Altitude: {self.initial_altitude:.2f} feet")
+                            log.info(f"Initial Altitude: {self.initial_altitude:.2f} feet")
                         elif log_update:
                             if self.altitude_warning_logged or not self.altitude_value_logged_after_warning:
-                                logging.info(f"Updated altitude: {self.altitude_feet:.2f} feet")
+                                log.info(f"Updated altitude: {self.altitude_feet:.2f} feet")
                                 self.altitude_warning_logged = False # Reset warning flag
                                 self.altitude_value_logged_after_warning = True # Set flag to prevent continuous info logs
                             else:
-                                logging.debug(f"Updated altitude: {self.altitude_feet:.2f} feet")
+                                log.debug("Updated altitude: %.2f feet", self.altitude_feet)
                 except (ValueError, TypeError) as e:
                     if not self.altitude_warning_logged:
-                        logging.warning(f"Error converting altitude_raw '{altitude_raw}' to float: {e}. Using previous or default altitude.")
+                        log.warning(f"Error converting altitude_raw '{altitude_raw}' to float: {e}. Using previous or default altitude.")
                         self.altitude_warning_logged = True
                     self.altitude_value_logged_after_warning = False # Reset flag for next valid value
             else:
                 if not self.altitude_warning_logged:
-                    logging.warning("Could not retrieve altitude from D-Bus. Service might be gone or path invalid. Using previous or default altitude.")
+                    log.warning("Could not retrieve altitude from D-Bus. Service might be gone or path invalid. Using previous or default altitude.")
                     self.altitude_warning_logged = True
                 self.altitude_value_logged_after_warning = False
         else:
-            logging.debug("GPS service not found for altitude. Using default value.")
+            log.debug("GPS service not found for altitude. Using default value.")
             self.altitude_value_logged_after_warning = False
 
-    def _update_generator_temperature(self, log_update=True, log_initial=False):
+    def _update_generator_temperature(self, temp_celsius, log_update=True, log_initial=False):
         if self.generator_temp_service_name:
-            temp_celsius = self._get_dbus_value(self.generator_temp_service_name, TEMPERATURE_PATH)
             if temp_celsius is not None:
-                self.generator_temp_fahrenheit = (temp_celsius * 9/5) + 32
+                self.generator_temp_fahrenheit = _celsius_to_fahrenheit(temp_celsius)
                 if log_initial and self.initial_generator_temp is None:
                     self.initial_generator_temp = self.generator_temp_fahrenheit
-                    logging.info(f"Initial Generator Temperature: {self.initial_generator_temp:.2f} F")
+                    log.info(f"Initial Generator Temperature: {self.initial_generator_temp:.2f} F")
                 elif log_update and self.generator_temp_fahrenheit > 212.0:
-                    logging.debug(f"Generator temperature above threshold: {self.generator_temp_fahrenheit:.2f} F")
+                    log.debug("Generator temperature above threshold: %.2f F", self.generator_temp_fahrenheit)
                 elif log_update:
-                    logging.debug(f"Generator temperature: {self.generator_temp_fahrenheit:.2f} F (below threshold)")
+                    log.debug("Generator temperature: %.2f F (below threshold)", self.generator_temp_fahrenheit)
             else:
-                logging.debug("Could not retrieve generator temperature from D-Bus. Service might be gone or path invalid.")
+                log.debug("Could not retrieve generator temperature from D-Bus. Service might be gone or path invalid.")
         else:
-            logging.debug("Generator temperature service not found. Using default value.")
+            log.debug("Generator temperature service not found. Using default value.")
 
-    def _update_gen_auto_current_state(self, initial_read=False):
+    def _update_gen_auto_current_state(self, state, initial_read=False):
         if self.gen_auto_current_service:
-            state = self._get_dbus_value(self.gen_auto_current_service, STATE_PATH)
             if state is not None:
                 state = int(state)
                 if initial_read:
                     self.gen_auto_current_state = state
                     self.previous_gen_auto_current_state = state
-                    logging.info(f"Initial 'Gen Auto Current' state: {self.gen_auto_current_state} (ON: {GEN_AUTO_CURRENT_ON}, OFF: {GEN_AUTO_CURRENT_OFF})")
+                    log.info(f"Initial 'Gen Auto Current' state: {self.gen_auto_current_state} (ON: {GEN_AUTO_CURRENT_ON}, OFF: {GEN_AUTO_CURRENT_OFF})")
                 elif state != self.previous_gen_auto_current_state:
                     self.previous_gen_auto_current_state = self.gen_auto_current_state
                     self.gen_auto_current_state = state
-                    logging.info(f"'Gen Auto Current' state changed to: {self.gen_auto_current_state} (ON: {GEN_AUTO_CURRENT_ON}, OFF: {GEN_AUTO_CURRENT_OFF})")
+                    log.info(f"'Gen Auto Current' state changed to: {self.gen_auto_current_state} (ON: {GEN_AUTO_CURRENT_ON}, OFF: {GEN_AUTO_CURRENT_OFF})")
                 else:
                     self.gen_auto_current_state = state
-                    logging.debug(f"'Gen Auto Current' state remains: {self.gen_auto_current_state} (ON: {GEN_AUTO_CURRENT_ON}, OFF: {GEN_AUTO_CURRENT_OFF})")
+                    log.debug("'Gen Auto Current' state remains: %s (ON: %s, OFF: %s)", self.gen_auto_current_state, GEN_AUTO_CURRENT_ON, GEN_AUTO_CURRENT_OFF)
             else:
-                logging.debug("Could not retrieve 'Gen Auto Current' state from D-Bus.")
+                log.debug("Could not retrieve 'Gen Auto Current' state from D-Bus.")
         else:
-            logging.debug("'Gen Auto Current' input service not found. Cannot read state.")
+            log.debug("'Gen Auto Current' input service not found. Cannot read state.")
 
 
     def _is_generator_running(self):
         if self.transfer_switch_service:
-            state = self._get_dbus_value(self.transfer_switch_service, STATE_PATH)
-            return state in GENERATOR_ON_VALUE
+            return self.transfer_switch_state in GENERATOR_ON_VALUE
         return False
 
-    def calculate_derating_factor(self, temperature_fahrenheit, altitude_feet, generator_temperature_fahrenheit):
-        temperature_multiplier = 1.0
-        altitude_multiplier = 1.0
-        generator_temp_multiplier = 1.0
-
-        if temperature_fahrenheit is not None:
-            if temperature_fahrenheit > self.BASE_TEMPERATURE_THRESHOLD_F:
-                temperature_multiplier = 1.0 - ((temperature_fahrenheit - self.BASE_TEMPERATURE_THRESHOLD_F) * self.TEMP_COEFFICIENT)
-                temperature_multiplier = max(0.0, temperature_multiplier)
+    def _outdoor_temperature_multiplier(self, temperature_fahrenheit):
+        if temperature_fahrenheit is not None and temperature_fahrenheit > self.BASE_TEMPERATURE_THRESHOLD_F:
+            return max(0.0, 1.0 - ((temperature_fahrenheit - self.BASE_TEMPERATURE_THRESHOLD_F) * self.TEMP_COEFFICIENT))
+        return 1.0
 
+    def _altitude_multiplier(self, altitude_feet):
         if altitude_feet is not None:
-            altitude_multiplier = 1.0 - (altitude_feet * self.ALTITUDE_COEFFICIENT)
-            altitude_multiplier = max(0.0, altitude_multiplier)
+            return max(0.0, 1.0 - (altitude_feet * self.ALTITUDE_COEFFICIENT))
+        return 1.0
 
+    def _generator_temperature_multiplier(self, generator_temperature_fahrenheit):
         if generator_temperature_fahrenheit is not None:
             if generator_temperature_fahrenheit >= self.HIGH_GENTEMP_THRESHOLD_F:
-                generator_temp_multiplier = self.HIGH_GENTEMP_REDUCTION
+                return self.HIGH_GENTEMP_REDUCTION
             elif generator_temperature_fahrenheit >= self.MEDIUM_GENTEMP_THRESHOLD_F:
-                generator_temp_multiplier = self.MEDIUM_GENTEMP_REDUCTION
-
-        return temperature_multiplier * altitude_multiplier * generator_temp_multiplier * self.OUTPUT_BUFFER
-
-    def _perform_derating(self):
+                return self.MEDIUM_GENTEMP_REDUCTION
+        return 1.0
+
+    def _refresh_derating_multipliers(self):
+        """Recomputes each cached linear multiplier only when its input moved past MULTIPLIER_INPUT_TOLERANCE."""
+        if self._outdoor_mult_input is None or abs(self.outdoor_temp_fahrenheit - self._outdoor_mult_input) > MULTIPLIER_INPUT_TOLERANCE:
+            self._outdoor_mult_input = self.outdoor_temp_fahrenheit
+            self._outdoor_mult = self._outdoor_temperature_multiplier(self.outdoor_temp_fahrenheit)
+        if self._altitude_mult_input is None or abs(self.altitude_feet - self._altitude_mult_input) > MULTIPLIER_INPUT_TOLERANCE:
+            self._altitude_mult_input = self.altitude_feet
+            self._altitude_mult = self._altitude_multiplier(self.altitude_feet)
+
+    def _perform_derating(self, gen_limit_setting, writes):
+        # The result only depends on these; the setting is included so a manual change is still overridden
+        derate_inputs = (self.outdoor_temp_fahrenheit, self.altitude_feet, self.generator_temp_fahrenheit, gen_limit_setting)
+        if derate_inputs == self._last_derate_inputs:
+            return
         if self.outdoor_temp_fahrenheit is not None and self.altitude_feet is not None and self.generator_temp_fahrenheit is not None:
-            derating_factor = self.calculate_derating_factor(
-                self.outdoor_temp_fahrenheit, self.altitude_feet, self.generator_temp_fahrenheit
-            )
-            derated_output_amps = self.BASE_GENERATOR_OUTPUT_AMPS * derating_factor
-            rounded_output = round(derated_output_amps, 1)
-
-            current_generator_limit_setting = self._get_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)
+            self._last_derate_inputs = derate_inputs
+            self._refresh_derating_multipliers()
+            # The generator temperature steps at its thresholds, so it is never held within a tolerance
+            generator_temp_multiplier = self._generator_temperature_multiplier(self.generator_temp_fahrenheit)
+            derated_output_amps = self._buffered_output_amps * self._altitude_mult * self._outdoor_mult * generator_temp_multiplier
+            output_q = _q(derated_output_amps)
+            rounded_output = output_q / 10
 
             if not self.initial_derated_output_logged:
-                self._set_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH, rounded_output)
-                logging.info(f"Initial Transfer Switch Generator Current Limit set to: {rounded_output:.1f} Amps (due to auto derating)")
+                writes[(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)] = rounded_output
+                log.info(f"Initial Transfer Switch Generator Current Limit set to: {rounded_output:.1f} Amps (due to auto derating)")
                 self.initial_derated_output_logged = True
-            elif current_generator_limit_setting is None or abs(current_generator_limit_setting - rounded_output) > 0.01:
-                self._set_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH, rounded_output)
-                logging.debug(f"Transfer Switch Generator Current Limit updated to: {rounded_output:.1f} Amps (due to auto derating)")
+            elif gen_limit_setting is None or _q(gen_limit_setting) != output_q:
+                writes[(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)] = rounded_output
+                log.debug("Transfer Switch Generator Current Limit updated to: %.1f Amps (due to auto derating)", rounded_output)
             else:
-                logging.debug(f"Transfer Switch Generator Current Limit remains: {rounded_output:.1f} Amps")
+                log.debug("Transfer Switch Generator Current Limit remains: %.1f Amps", rounded_output)
 
         else:
-            logging.warning("Not all temperature or altitude data available for derating. Skipping calculation.")
-
-    def _sync_generator_limit_to_ac_input(self):
-        if self.vebus_service and self._is_generator_running():
-            current_generator_limit_setting = self._get_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)
-            if current_generator_limit_setting is not None:
-                rounded_gen_limit = round(float(current_generator_limit_setting), 1)
-
-                if self.previous_generator_current_limit_setting is None or abs(self.previous_generator_current_limit_setting - rounded_gen_limit) > 0.01:
-                    self._set_dbus_value(self.vebus_service, AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH, rounded_gen_limit)
-                    logging.debug(f"Generator running: Synced VE.Bus AC Active Input Current Limit to Generator Current Limit ({rounded_gen_limit:.1f} Amps).")
-                    self.previous_ac_current_limit = rounded_gen_limit
-                    self.previous_generator_current_limit_setting = rounded_gen_limit
+            log.warning("Not all temperature or altitude data available for derating. Skipping calculation.")
+
+    def _sync_generator_limit_to_ac_input(self, running, gen_limit_setting, ac_limit, writes):
+        if self.vebus_service and running:
+            if gen_limit_setting is not None:
+                gen_limit_q = _q(gen_limit_setting)
+
+                if gen_limit_q != self._previous_generator_current_limit_setting_q:
+                    if ac_limit is not None and _q(ac_limit) == gen_limit_q:
+                        log.debug("Generator running: VE.Bus AC Active Input Current Limit already at Generator Current Limit (%.1f Amps).", gen_limit_q / 10)
+                    else:
+                        writes[(self.vebus_service, AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH)] = gen_limit_q / 10
+                        log.debug("Generator running: Synced VE.Bus AC Active Input Current Limit to Generator Current Limit (%.1f Amps).", gen_limit_q / 10)
+                    self._previous_ac_current_limit_q = gen_limit_q
+                    self._previous_generator_current_limit_setting_q = gen_limit_q
                 else:
-                    logging.debug(f"Generator running: VE.Bus AC Active Input Current Limit already matches Generator Current Limit ({rounded_gen_limit:.1f} Amps).")
+                    log.debug("Generator running: VE.Bus AC Active Input Current Limit already matches Generator Current Limit (%.1f Amps).", gen_limit_q / 10)
             else:
-                logging.warning("Could not retrieve Generator Current Limit setting. Cannot sync to AC input.")
+                log.warning("Could not retrieve Generator Current Limit setting. Cannot sync to AC input.")
         elif self.vebus_service:
-            logging.debug("Generator not running, AC Active Input Current Limit not synced from generator current limit setting.")
+            log.debug("Generator not running, AC Active Input Current Limit not synced from generator current limit setting.")
 
 
-    def _sync_generator_limit_from_ac_input(self):
-        if self.vebus_service and self._is_generator_running():
-            current_ac_limit = self._get_dbus_value(self.vebus_service, AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH)
-            if current_ac_limit is not None:
-                rounded_ac_limit = round(float(current_ac_limit), 1)
+    def _sync_generator_limit_from_ac_input(self, gen_limit_setting, ac_limit, writes):
+        # Only called by _tick while the generator is running with 'Gen Auto Current' OFF
+        if self.vebus_service:
+            if ac_limit is not None:
+                ac_limit_q = _q(ac_limit)
 
-                if self.previous_ac_current_limit is None or abs(rounded_ac_limit - self.previous_ac_current_limit) > 0.01:
-                    current_gen_limit = self._get_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)
-                    if current_gen_limit is None or abs(current_gen_limit - rounded_ac_limit) > 0.01:
-                        self._set_dbus_value(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH, rounded_ac_limit)
-                        logging.info(f"Generator running and Active AC Current Limit has been manually changed: Synced Generator Current Limit to VE.Bus AC Active Input Current Limit ({rounded_ac_limit:.1f} Amps).")
-                        self.previous_generator_current_limit_setting = rounded_ac_limit
+                if ac_limit_q != self._previous_ac_current_limit_q:
+                    if gen_limit_setting is None or _q(gen_limit_setting) != ac_limit_q:
+                        writes[(self.settings_service_name, GENERATOR_CURRENT_LIMIT_PATH)] = ac_limit_q / 10
+                        log.info(f"Generator running and Active AC Current Limit has been manually changed: Synced Generator Current Limit to VE.Bus AC Active Input Current Limit ({ac_limit_q / 10:.1f} Amps).")
+                        self._previous_generator_current_limit_setting_q = ac_limit_q
 
-                    self.previous_ac_current_limit = rounded_ac_limit
+                    self._previous_ac_current_limit_q = ac_limit_q
                 else:
-                    logging.debug(f"Generator running: VE.Bus AC Active Input Current Limit ({rounded_ac_limit:.1f} Amps) has not changed.")
+                    log.debug("Generator running: VE.Bus AC Active Input Current Limit (%.1f Amps) has not changed.", ac_limit_q / 10)
             else:
-                logging.warning("Could not retrieve VE.Bus AC Active Input Current Limit. Cannot sync to generator current limit.")
-        elif self.vebus_service:
-            if not self._is_generator_running():
-                logging.debug("Generator not running, AC Active Input Current Limit not synced to generator current limit.")
-            elif self.gen_auto_current_state == GEN_AUTO_CURRENT_ON:
-                logging.debug(f"'Gen Auto Current' is ON ({GEN_AUTO_CURRENT_ON}), AC Active Input Current Limit not synced to generator current limit.")
-
-    def _periodic_monitoring(self):
-        if not self.vebus_service:
-            self._find_service_once(self._find_vebus_service, 'vebus_service', 'VE.Bus service')
-        if not self.outdoor_temp_service_name:
-            self._find_service_once(self._find_outdoor_temperature_service, 'outdoor_temp_service_name', 'outdoor temperature service')
-        if not self.generator_temp_service_name:
-            self._find_service_once(self._find_generator_temperature_service, 'generator_temp_service_name', 'generator temperature service')
-        if not self.gps_service_name:
-            self._find_service_once(self._find_gps_service_internal, 'gps_service_name', 'GPS service')
-        if not self.transfer_switch_service:
-            self._find_service_once(self._find_transfer_switch_input_internal, 'transfer_switch_service', 'transfer switch input service')
-        if not self.gen_auto_current_service:
-            self._find_service_once(self._find_gen_auto_current_input_internal, 'gen_auto_current_service', "'Gen Auto Current' input service")
-
-        self._update_outdoor_temperature()
-        self._update_altitude()
-        self._update_generator_temperature()
-        self._update_gen_auto_current_state()
-
-        self._sync_generator_limit_to_ac_input()
-
-        if self._is_generator_running() and self.gen_auto_current_state == GEN_AUTO_CURRENT_OFF:
-             self._sync_generator_limit_from_ac_input()
+                log.warning("Could not retrieve VE.Bus AC Active Input Current Limit. Cannot sync to generator current limit.")
+
+    def _tick(self):
+        """Runs one monitoring pass: read every input once, compute, then write only what changed."""
+        # Read phase
+        running = self._is_generator_running()
+        auto_state = self.gen_auto_current_state
+        gen_limit_setting = self.generator_current_limit_setting
+        ac_limit = self.ac_current_limit
+        sync_from_ac = running and auto_state == GEN_AUTO_CURRENT_OFF
+
+        # Compute phase, collecting (service_name, path) -> value
+        writes = {}
+        self._sync_generator_limit_to_ac_input(running, gen_limit_setting, ac_limit, writes)
+
+        if sync_from_ac:
+             # An AC write queued above is not on the bus yet; compare against it, not the stale reading,
+             # or the user's new generator limit looks like a manual AC change and is written back
+             ac_limit = writes.get((self.vebus_service, AC_ACTIVE_INPUT_CURRENT_LIMIT_PATH), ac_limit)
+             self._sync_generator_limit_from_ac_input(gen_limit_setting, ac_limit, writes)
         else:
-             logging.debug(f"Generator not running or 'Gen Auto Current' is ON ({self.gen_auto_current_state}). Skipping sync from AC input.")
+             log.debug("Generator not running or 'Gen Auto Current' is ON (%s). Skipping sync from AC input.", auto_state)
 
-        if self.gen_auto_current_state == GEN_AUTO_CURRENT_ON:
-            self._perform_derating()
+        if auto_state == GEN_AUTO_CURRENT_ON:
+            self._perform_derating(gen_limit_setting, writes)
         else:
-            logging.debug(f"Gen Auto Current state is not ON ({GEN_AUTO_CURRENT_ON}). Current state: {self.gen_auto_current_state}")
+            log.debug("Gen Auto Current state is not ON (%s). Current state: %s", GEN_AUTO_CURRENT_ON, auto_state)
+
+        # Write phase
+        for (service_name, path), value in writes.items():
+            self._set_dbus_value(service_name, path, value)
 
+    def _periodic_monitoring(self):
+        # NameOwnerChanged only covers services coming and going; a sensor renamed in the GUI
+        # or a probe that failed is picked up here. Reuses the name index, so no bus listing.
+        # The watched values are re-read too, then one tick also retries any failed write.
+        if not self._discovery_complete:
+            self._discover_missing_services()
+        self._refresh_watched_values()
+        self._schedule_tick() # coalesces with the tick the refreshed values may already have queued
         return True
 
+    def _refresh_watched_values(self):
+        """Re-reads every watched path, so a missed PropertiesChanged cannot leave its cached value stale."""
+        for service_name, path in list(self._signal_matches):
+            value = self._get_dbus_value(service_name, path, logging.DEBUG)
+            if value is not None:
+                self._on_props_changed(service_name, path, {'Value': value})
+
 def main():
     DBusGMainLoop(set_as_default=True)
     GeneratorDeratingMonitor()
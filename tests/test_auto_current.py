@@ -0,0 +1,309 @@
+"""Runs GeneratorDeratingMonitor against an in-memory bus and mainloop.
+
+python -m unittest discover -s tests
+"""
+import collections
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+SETTINGS = "com.victronenergy.settings"
+VEBUS = "com.victronenergy.vebus.ttyS4"
+TRANSFER_SWITCH = "com.victronenergy.digitalinput.input_1"
+GEN_AUTO_CURRENT = "com.victronenergy.digitalinput.input_2"
+GEN_LIMIT = "/Settings/TransferSwitch/GeneratorCurrentLimit"
+AC_LIMIT = "/Ac/ActiveIn/CurrentLimit"
+STATE = "/State"
+PRODUCT_NAME = "/ProductName"
+CUSTOM_NAME = "/CustomName"
+TEMPERATURE = "/Temperature"
+TEMPERATURE_SENSOR = "com.victronenergy.temperature.adc_1"
+
+
+class DBusException(Exception):
+    pass
+
+
+class Array(list):
+    pass
+
+
+class FakeMainLoop:
+    """Stands in for GLib: idle callbacks run when run_until_idle is called."""
+    PRIORITY_LOW = 300
+    PRIORITY_DEFAULT_IDLE = 200
+    SOURCE_REMOVE = False
+
+    def __init__(self):
+        self.queue = collections.deque()
+
+    def idle_add(self, callback, *args, **kwargs):
+        self.queue.append((callback, args))
+        return len(self.queue)
+
+    def timeout_add_seconds(self, interval, callback, *args, **kwargs):
+        return 0 # timers never fire; tests drive the monitor directly
+
+    def run_until_idle(self, limit=200):
+        for _ in range(limit):
+            if not self.queue:
+                return
+            callback, args = self.queue.popleft()
+            callback(*args)
+        raise AssertionError("mainloop never went idle")
+
+
+class FakeMatch:
+    def __init__(self, receivers, key):
+        self.receivers = receivers
+        self.key = key
+
+    def remove(self):
+        self.receivers.pop(self.key, None)
+
+
+class FakeBus:
+    """BusItem services as a {(service, path): value} dict; SetValue replies and signals arrive via the mainloop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.values = {}
+        self.receivers = {}
+        self.set_calls = []
+        self.get_calls = []
+        self.signal_delay = {} # service -> extra mainloop hops before its PropertiesChanged is delivered
+
+    def list_names(self):
+        return sorted({service for service, _ in self.values})
+
+    def add_signal_receiver(self, handler, signal_name=None, dbus_interface=None, bus_name=None, path=None):
+        key = (bus_name, path)
+        self.receivers[key] = handler
+        return FakeMatch(self.receivers, key)
+
+    def get_object(self, service, path):
+        return FakeObject(self, service, path)
+
+    def emit(self, service, path, hops=0):
+        if hops:
+            self.loop.idle_add(self.emit, service, path, hops - 1)
+            return
+        handler = self.receivers.get((service, path))
+        if handler:
+            handler({'Value': self.values[(service, path)]})
+
+    def change(self, service, path, value):
+        """A change made by something other than the monitor, e.g. the GUI."""
+        self.values[(service, path)] = value
+        self.loop.idle_add(self.emit, service, path, self.signal_delay.get(service, 0))
+
+
+class FakeObject:
+    def __init__(self, bus, service, path):
+        self.bus = bus
+        self.service = service
+        self.path = path
+
+    def get_dbus_method(self, name, interface):
+        return getattr(self, name)
+
+    def GetValue(self):
+        self.bus.get_calls.append((self.service, self.path))
+        try:
+            return self.bus.values[(self.service, self.path)]
+        except KeyError:
+            raise DBusException(f"{self.service}{self.path} does not exist")
+
+    def SetValue(self, value, reply_handler=None, error_handler=None):
+        self.bus.set_calls.append((self.service, self.path, value))
+        self.bus.loop.idle_add(reply_handler, 0)
+        self.bus.change(self.service, self.path, value)
+
+
+def load_module(loop, bus):
+    """Imports auto_current with dbus, GLib and velib replaced by the fakes above."""
+    dbus = types.ModuleType("dbus")
+    dbus.SystemBus = lambda: bus
+    dbus.Array = Array
+    dbus.exceptions = types.ModuleType("dbus.exceptions")
+    dbus.exceptions.DBusException = DBusException
+    dbus.mainloop = types.ModuleType("dbus.mainloop")
+    dbus.mainloop.glib = types.ModuleType("dbus.mainloop.glib")
+    dbus.mainloop.glib.DBusGMainLoop = lambda set_as_default=False: None
+    gi = types.ModuleType("gi")
+    gi.repository = types.ModuleType("gi.repository")
+    gi.repository.GLib = loop
+    ve_utils = types.ModuleType("ve_utils")
+    ve_utils.wrap_dbus_value = lambda value: value
+    sys.modules.update({
+        "dbus": dbus,
+        "dbus.exceptions": dbus.exceptions,
+        "dbus.mainloop": dbus.mainloop,
+        "dbus.mainloop.glib": dbus.mainloop.glib,
+        "gi": gi,
+        "gi.repository": gi.repository,
+        "ve_utils": ve_utils,
+    })
+    sys.modules.pop("auto_current", None)
+    return importlib.import_module("auto_current")
+
+
+class MonitorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.loop = FakeMainLoop()
+        self.bus = FakeBus(self.loop)
+        self.module = load_module(self.loop, self.bus)
+        # Keep tests away from the device's real config and service cache
+        data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(data_dir.cleanup)
+        self.module.CONFIG_FILE_PATH = os.path.join(data_dir.name, "optionsSet")
+        self.module.SERVICE_CACHE_FILE_PATH = os.path.join(data_dir.name, "services.json")
+        self.bus.values.update({
+            (SETTINGS, GEN_LIMIT): 30.0,
+            (VEBUS, AC_LIMIT): 30.0,
+            (TRANSFER_SWITCH, PRODUCT_NAME): "Transfer switch",
+            (TRANSFER_SWITCH, STATE): 12, # on generator
+            (GEN_AUTO_CURRENT, PRODUCT_NAME): "Gen Auto Current",
+            (GEN_AUTO_CURRENT, STATE): self.module.GEN_AUTO_CURRENT_OFF,
+        })
+        self.monitor = None
+
+    def make_monitor(self):
+        self.monitor = self.module.GeneratorDeratingMonitor()
+        return self.monitor
+
+    def start(self):
+        """Watches the services set up by the test, then lets the startup ticks settle."""
+        self.make_monitor()
+        for attr, service in (('vebus_service', VEBUS), ('transfer_switch_service', TRANSFER_SWITCH),
+                              ('gen_auto_current_service', GEN_AUTO_CURRENT)):
+            setattr(self.monitor, attr, service)
+            self.monitor._watch_service(attr)
+        self.monitor._watch_path(SETTINGS, GEN_LIMIT)
+        self.monitor._read_initial_values()
+        self.loop.run_until_idle()
+        self.bus.set_calls.clear()
+
+
+class GeneratorLimitChangeTest(MonitorTestCase):
+    """A GUI change of the generator limit, with the generator running and Gen Auto Current OFF."""
+
+    def assert_single_ac_write(self):
+        self.start()
+        self.bus.change(SETTINGS, GEN_LIMIT, 25.0)
+        self.loop.run_until_idle()
+        self.assertEqual(self.bus.set_calls, [(VEBUS, AC_LIMIT, 25.0)])
+        self.assertEqual(self.bus.values[(SETTINGS, GEN_LIMIT)], 25.0)
+        self.assertEqual(self.bus.values[(VEBUS, AC_LIMIT)], 25.0)
+
+    def test_settings_signal_first(self):
+        self.bus.signal_delay[VEBUS] = 2
+        self.assert_single_ac_write()
+
+    def test_vebus_signal_first(self):
+        self.bus.signal_delay[SETTINGS] = 2
+        self.assert_single_ac_write()
+
+
+class ServiceCacheTest(MonitorTestCase):
+    def write_cache(self, names):
+        with open(self.module.SERVICE_CACHE_FILE_PATH, "w") as f:
+            json.dump(names, f)
+
+    def test_saved_name_now_holding_another_role(self):
+        # input_1 was the Gen Auto Current input when the cache was written; it is now the transfer switch
+        self.write_cache({'gen_auto_current_service': TRANSFER_SWITCH})
+        monitor = self.make_monitor()
+        monitor._delayed_initialization()
+        self.loop.run_until_idle()
+        self.assertEqual(monitor.transfer_switch_service, TRANSFER_SWITCH)
+        self.assertEqual(monitor.gen_auto_current_service, GEN_AUTO_CURRENT)
+        self.assertTrue(monitor._is_generator_running())
+
+        self.bus.change(TRANSFER_SWITCH, STATE, 13) # back on shore power
+        self.loop.run_until_idle()
+        self.assertFalse(monitor._is_generator_running())
+
+    def test_saved_names_skip_the_scan(self):
+        self.write_cache({'transfer_switch_service': TRANSFER_SWITCH, 'gen_auto_current_service': GEN_AUTO_CURRENT})
+        monitor = self.make_monitor()
+        monitor._delayed_initialization()
+        self.loop.run_until_idle()
+        self.assertEqual(monitor.transfer_switch_service, TRANSFER_SWITCH)
+        self.assertEqual(monitor.gen_auto_current_service, GEN_AUTO_CURRENT)
+        # Each saved input is confirmed with one read; a scan would also probe input_1 for Gen Auto Current
+        probes = [call for call in self.bus.get_calls if call[1] == PRODUCT_NAME]
+        self.assertEqual(sorted(probes), [(TRANSFER_SWITCH, PRODUCT_NAME), (GEN_AUTO_CURRENT, PRODUCT_NAME)])
+        with open(self.module.SERVICE_CACHE_FILE_PATH) as f:
+            self.assertEqual(json.load(f)['vebus_service'], VEBUS)
+
+
+class DiscoveryRetryTest(MonitorTestCase):
+    def test_sensor_renamed_after_startup(self):
+        self.bus.values.update({(TEMPERATURE_SENSOR, CUSTOM_NAME): "Temperature sensor", (TEMPERATURE_SENSOR, TEMPERATURE): 30.0})
+        monitor = self.make_monitor()
+        monitor._delayed_initialization()
+        self.loop.run_until_idle()
+        self.assertIsNone(monitor.outdoor_temp_service_name)
+
+        self.bus.values[(TEMPERATURE_SENSOR, CUSTOM_NAME)] = "Outdoor" # renamed in the GUI; no bus name changes
+        monitor._periodic_monitoring()
+        self.loop.run_until_idle()
+        self.assertEqual(monitor.outdoor_temp_service_name, TEMPERATURE_SENSOR)
+        self.assertAlmostEqual(monitor.outdoor_temp_fahrenheit, 86.0)
+
+
+class WatchdogTest(MonitorTestCase):
+    def test_missed_signal_is_recovered(self):
+        self.start()
+        self.bus.values[(VEBUS, AC_LIMIT)] = 20.0 # changed without a PropertiesChanged
+        self.monitor._periodic_monitoring()
+        self.loop.run_until_idle()
+        self.assertEqual(self.monitor.ac_current_limit, 20.0)
+        self.assertEqual(self.bus.values[(SETTINGS, GEN_LIMIT)], 20.0)
+
+
+class DeratingTest(MonitorTestCase):
+    def derate(self, monitor, gen_limit_setting):
+        writes = {}
+        monitor._perform_derating(gen_limit_setting, writes)
+        return writes.get((SETTINGS, GEN_LIMIT))
+
+    def expected_limit(self, monitor):
+        factor = (monitor._outdoor_temperature_multiplier(monitor.outdoor_temp_fahrenheit)
+                  * monitor._altitude_multiplier(monitor.altitude_feet)
+                  * monitor._generator_temperature_multiplier(monitor.generator_temp_fahrenheit))
+        return self.module._q(monitor.BASE_GENERATOR_OUTPUT_AMPS * monitor.OUTPUT_BUFFER * factor) / 10
+
+    def test_generator_temperature_threshold_crossing(self):
+        monitor = self.make_monitor()
+        monitor.generator_temp_fahrenheit = monitor.MEDIUM_GENTEMP_THRESHOLD_F - 0.2
+        below = self.derate(monitor, None)
+        self.assertEqual(below, self.expected_limit(monitor))
+
+        monitor.generator_temp_fahrenheit = monitor.MEDIUM_GENTEMP_THRESHOLD_F + 0.2 # a smaller step than the tolerance
+        above = self.derate(monitor, below)
+        self.assertEqual(above, self.expected_limit(monitor))
+        self.assertLess(above, below)
+
+
+class AltitudeTest(MonitorTestCase):
+    def test_sea_level_after_fix_is_acquired(self):
+        monitor = self.make_monitor()
+        monitor.gps_service_name = "com.victronenergy.gps.ve_ttyUSB0"
+        monitor._update_altitude(Array(), log_initial=True) # no fix yet
+        self.assertEqual(monitor.altitude_feet, monitor.DEFAULT_ALTITUDE_FEET)
+        monitor._update_altitude(0.0, log_initial=True)
+        self.assertEqual(monitor.altitude_feet, 0.0)
+        monitor._update_altitude(Array([100.0]))
+        self.assertAlmostEqual(monitor.altitude_feet, 100.0 * self.module.ALT_M_TO_FT)
+
+
+if __name__ == "__main__":
+    unittest.main()